@@ -4,11 +4,16 @@
 
 import configparser
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import List, Optional, Union, Set
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Union, Set, Tuple
 
+try:
+    import ahocorasick  # 可选依赖：关键词较多时加速匹配
+except ImportError:
+    ahocorasick = None
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class TelegramConfig:
     """Telegram API 配置"""
     api_id: int
@@ -16,14 +21,23 @@ class TelegramConfig:
     bot_token: Optional[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModeConfig:
     """运行模式配置"""
     run_mode: str  # 'bot' 或 'user'
     session_name: str
 
+    # 由 run_mode 预先计算，避免每次访问时重复 lower()
+    is_bot: bool = field(init=False, repr=False)
+    is_user: bool = field(init=False, repr=False)
+
+    def __post_init__(self):
+        run_mode = self.run_mode.lower()
+        object.__setattr__(self, "is_bot", run_mode == "bot")
+        object.__setattr__(self, "is_user", run_mode == "user")
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MonitorConfig:
     """监听配置"""
     monitor_mode: str  # 'custom' 或 'auto'
@@ -31,23 +45,78 @@ class MonitorConfig:
     exclude_chats: List[Union[int, str]]
     chat_types: Set[str]  # 要监听的群组类型
 
+    # 由 monitor_mode 预先计算
+    is_auto: bool = field(init=False, repr=False)
 
-@dataclass
+    def __post_init__(self):
+        object.__setattr__(self, "is_auto", self.monitor_mode.lower() == "auto")
+
+
+@dataclass(frozen=True, slots=True)
 class ForwardConfig:
     """转发配置"""
     target_chats: List[Union[int, str]]
     forward_mode: str  # 'extract' 或 'forward'
+    concurrency: int = 8  # 同时发送到目标群组的最大请求数
+    rate_limit: int = 25  # 全局发送速率上限（条/秒）
+    batch_window_ms: int = 500  # 同一来源节点消息的合并窗口（毫秒），0 表示不合并
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FilterConfig:
     """过滤配置"""
     nodes_only: bool
     keywords: List[str]
     exclude_keywords: List[str]
 
+    # 预先转为小写的关键词
+    _keywords_lower: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _exclude_lower: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    # 预编译的关键词自动机（安装 pyahocorasick 时可用）
+    _keywords_automaton: Any = field(init=False, repr=False, compare=False)
+    _exclude_automaton: Any = field(init=False, repr=False, compare=False)
 
-@dataclass
+    def __post_init__(self):
+        keywords_lower = tuple(kw.lower() for kw in self.keywords)
+        exclude_lower = tuple(kw.lower() for kw in self.exclude_keywords)
+        object.__setattr__(self, "_keywords_lower", keywords_lower)
+        object.__setattr__(self, "_exclude_lower", exclude_lower)
+        object.__setattr__(self, "_keywords_automaton", build_keyword_automaton(keywords_lower))
+        object.__setattr__(self, "_exclude_automaton", build_keyword_automaton(exclude_lower))
+
+    def has_keyword(self, text_lower: str) -> bool:
+        """已转为小写的文本是否包含任一关键词"""
+        return _match_any(text_lower, self._keywords_lower, self._keywords_automaton)
+
+    def has_exclude_keyword(self, text_lower: str) -> bool:
+        """已转为小写的文本是否包含任一排除关键词"""
+        return _match_any(text_lower, self._exclude_lower, self._exclude_automaton)
+
+
+def build_keyword_automaton(keywords: Tuple[str, ...]) -> Any:
+    """
+    将小写关键词编译为 Aho-Corasick 自动机，一次扫描即可匹配全部关键词
+
+    未安装 pyahocorasick 或关键词为空时返回 None
+    """
+    if ahocorasick is None or not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _match_any(text_lower: str, keywords_lower: Tuple[str, ...], automaton: Any) -> bool:
+    """检查小写文本是否包含任一小写关键词"""
+    if automaton is not None:
+        return next(automaton.iter(text_lower), None) is not None
+    return any(keyword in text_lower for keyword in keywords_lower)
+
+
+@dataclass(frozen=True, slots=True)
 class ProxyConfig:
     """代理配置"""
     enabled: bool
@@ -57,15 +126,27 @@ class ProxyConfig:
     username: Optional[str]
     password: Optional[str]
 
+    def to_pyrogram(self) -> dict:
+        """转换为 Pyrogram Client 的 proxy 参数"""
+        proxy = {
+            "scheme": self.type,
+            "hostname": self.host,
+            "port": self.port,
+        }
+        if self.username and self.password:
+            proxy["username"] = self.username
+            proxy["password"] = self.password
+        return proxy
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     """日志配置"""
     level: str
     file: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BotConfig:
     """机器人完整配置"""
     telegram: TelegramConfig
@@ -82,17 +163,17 @@ class BotConfig:
     @property
     def is_bot_mode(self) -> bool:
         """是否为 Bot 模式"""
-        return self.mode.run_mode.lower() == 'bot'
+        return self.mode.is_bot
 
     @property
     def is_user_mode(self) -> bool:
         """是否为用户模式"""
-        return self.mode.run_mode.lower() == 'user'
+        return self.mode.is_user
 
     @property
     def is_auto_monitor(self) -> bool:
         """是否为自动监听模式"""
-        return self.monitor.monitor_mode.lower() == 'auto'
+        return self.monitor.is_auto
 
     @property
     def source_chats(self) -> List[Union[int, str]]:
@@ -101,59 +182,155 @@ class BotConfig:
             return self._dynamic_source_chats
         return self.monitor.source_chats
 
-    def set_dynamic_chats(self, chats: List[Union[int, str]]):
-        """设置动态群组列表（auto 模式使用）"""
-        self._dynamic_source_chats = chats
+    def with_dynamic_chats(self, chats: List[Union[int, str]]) -> "BotConfig":
+        """返回设置了动态群组列表的新配置（auto 模式使用）"""
+        return replace(self, _dynamic_source_chats=chats)
+
+
+def _split_items(value: str) -> List[str]:
+    """
+    按逗号拆分配置值并去除首尾空白，跳过空项
+
+    str.split/strip 均在 C 中完成，且 strip() 会去除全角空格等 Unicode 空白
+    """
+    return [item for item in (part.strip() for part in value.split(",")) if item]
+
+
+def canonical_chat_id(chat_id: Union[int, str]) -> Union[int, str]:
+    """规范化群组 ID：@username 统一转为小写（Telegram 用户名不区分大小写）"""
+    if isinstance(chat_id, str):
+        return chat_id.lower()
+    return chat_id
 
 
 def parse_chat_ids(chat_str: str) -> List[Union[int, str]]:
     """
     解析群组 ID 字符串为列表（支持数字 ID 或 @username）
+
+    @username 统一转为小写，重复项只保留第一次出现
     """
-    if not chat_str or not chat_str.strip():
+    if not chat_str:
         return []
 
     result = []
-    for chat_id in chat_str.split(","):
-        chat_id = chat_id.strip()
-        if not chat_id:
+    for chat_id in _split_items(chat_str):
+        if chat_id[0] == "@":
+            result.append(chat_id.lower())
             continue
+        try:
+            result.append(int(chat_id))
+        except ValueError:
+            # 首字符已确认不是 '@'，补全为 @username
+            result.append("@" + chat_id.lower())
 
-        if chat_id.startswith("@"):
-            result.append(chat_id)
-        else:
-            try:
-                result.append(int(chat_id))
-            except ValueError:
-                result.append(f"@{chat_id}" if not chat_id.startswith("@") else chat_id)
-
-    return result
+    return list(dict.fromkeys(result))
 
 
 def parse_keywords(keyword_str: str) -> List[str]:
     """解析关键词字符串为列表"""
-    if not keyword_str or not keyword_str.strip():
+    if not keyword_str:
         return []
-    return [kw.strip() for kw in keyword_str.split(",") if kw.strip()]
+    return _split_items(keyword_str)
 
 
 def parse_chat_types(type_str: str) -> Set[str]:
     """解析群组类型字符串为集合"""
-    if not type_str or not type_str.strip():
+    if not type_str:
         return set()  # 空集合表示所有类型
-    return {t.strip().lower() for t in type_str.split(",") if t.strip()}
+    return {t.lower() for t in _split_items(type_str)}
+
+
+# 已解析配置缓存: 绝对路径 -> (mtime_ns, size, BotConfig)
+_CONFIG_CACHE: Dict[str, Tuple[int, int, "BotConfig"]] = {}
+
+
+def invalidate_config_cache():
+    """清空配置缓存（测试或强制重新加载时使用）"""
+    _CONFIG_CACHE.clear()
 
 
 def load_config(config_path: str = "config.ini") -> BotConfig:
     """
     加载并解析配置文件
+
+    文件未修改（mtime 与大小均未变化）时直接返回缓存的配置对象
     """
     path = Path(config_path)
     if not path.exists():
         raise FileNotFoundError(f"配置文件不存在: {config_path}")
 
-    config = configparser.ConfigParser()
-    config.read(config_path, encoding="utf-8")
+    st = path.stat()
+    cache_key = str(path.resolve())
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    cfg = _parse_config(config_path)
+    _CONFIG_CACHE[cache_key] = (st.st_mtime_ns, st.st_size, cfg)
+    return cfg
+
+
+# 复用的解析器实例，每次重新加载前清空
+# 使用 RawConfigParser：配置中不使用 %()s 插值，且 token/密码中的 % 不会报错
+_PARSER = configparser.RawConfigParser()
+
+# 区分"未提供 fallback"与 fallback=None
+_UNSET = object()
+
+
+class _SectionReader:
+    """
+    从预先构建的 {section: {option: value}} 字典中读取配置值
+
+    接口与 ConfigParser 的 get/getint/getboolean 一致
+    """
+
+    __slots__ = ("_sections",)
+
+    def __init__(self, sections: Dict[str, Dict[str, str]]):
+        self._sections = sections
+
+    def get(self, section: str, option: str, fallback=_UNSET) -> str:
+        options = self._sections.get(section)
+        if options is None:
+            if fallback is _UNSET:
+                raise configparser.NoSectionError(section)
+            return fallback
+        value = options.get(option)
+        if value is None:
+            if fallback is _UNSET:
+                raise configparser.NoOptionError(option, section)
+            return fallback
+        return value
+
+    def getint(self, section: str, option: str, fallback=_UNSET) -> int:
+        value = self.get(section, option, fallback)
+        return value if value is fallback else int(value)
+
+    def getboolean(self, section: str, option: str, fallback=_UNSET) -> bool:
+        value = self.get(section, option, fallback)
+        if value is fallback:
+            return value
+        state = _PARSER.BOOLEAN_STATES.get(value.lower())
+        if state is None:
+            raise ValueError(f"Not a boolean: {value}")
+        return state
+
+
+def _read_sections(config_path: str) -> _SectionReader:
+    """读取配置文件并展开为普通字典"""
+    _PARSER.clear()
+    _PARSER.defaults().clear()
+    _PARSER.read_string(Path(config_path).read_text(encoding="utf-8"), source=config_path)
+    return _SectionReader({
+        name: dict(_PARSER.items(name))
+        for name in _PARSER.sections()
+    })
+
+
+def _parse_config(config_path: str) -> BotConfig:
+    """解析配置文件内容"""
+    config = _read_sections(config_path)
 
     # 解析 Telegram 配置
     bot_token = config.get("telegram", "bot_token", fallback="").strip()
@@ -180,7 +357,10 @@ def load_config(config_path: str = "config.ini") -> BotConfig:
     # 解析转发配置
     forward = ForwardConfig(
         target_chats=parse_chat_ids(config.get("forward", "target_chats", fallback="")),
-        forward_mode=config.get("forward", "forward_mode", fallback="extract").strip().lower()
+        forward_mode=config.get("forward", "forward_mode", fallback="extract").strip().lower(),
+        concurrency=config.getint("forward", "concurrency", fallback=8),
+        rate_limit=config.getint("forward", "rate_limit", fallback=25),
+        batch_window_ms=config.getint("forward", "batch_window_ms", fallback=500)
     )
 
     # 解析过滤配置
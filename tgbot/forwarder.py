@@ -3,16 +3,54 @@
 """
 
 import asyncio
-from typing import List, Optional, Dict, Union
+import sys
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, List, Optional, Dict, Set, TypeVar, Union
+from aiolimiter import AsyncLimiter
 from pyrogram import Client
 from pyrogram.errors import FloodWait, ChatWriteForbidden, ChannelPrivate, PeerIdInvalid
-from pyrogram.types import Message
+from pyrogram.raw.base import InputPeer
+from pyrogram.raw.functions.messages import SendMessage
+from pyrogram.types import Chat, Message
 
+from config import canonical_chat_id
 from logger import setup_logger
 
 logger = setup_logger("forwarder")
 
 ChatId = Union[int, str]
+T = TypeVar("T")
+
+# 并发解析目标群组的最大数量
+RESOLVE_CONCURRENCY = 8
+
+# 同时进行的群组查询请求（get_chat / get_dialogs）上限
+PEER_CONCURRENCY = 100
+
+# 默认并发发送到目标群组的最大数量
+SEND_CONCURRENCY = 8
+
+# 默认全局发送速率（条/秒），与 Telegram 群发限制一致
+RATE_LIMIT = 25
+# FloodWait 重试次数与退避等待的封顶秒数（Telegram 要求更久时按要求等待，不提前重试）
+# FloodWait 重试次数与单次最长等待秒数（要求等待更久时直接放弃，不提前重试）
+FLOOD_RETRIES = 3
+FLOOD_WAIT_CAP = 60
+
+# 解析失败结果的缓存时间（秒），过期后允许重新解析
+UNRESOLVABLE_TTL = 60
+
+# 默认的节点合并窗口（毫秒）
+BATCH_WINDOW_MS = 500
+
+# Telegram 单条消息的最大长度（按 UTF-16 码元计算）
+MAX_MESSAGE_LENGTH = 4096
+
+
+def _text_length(text: str) -> int:
+    """按 Telegram 的计数方式（UTF-16 码元）计算文本长度"""
+    return len(text.encode("utf-16-le")) // 2
 
 
 class NodeForwarder:
@@ -22,7 +60,12 @@ class NodeForwarder:
         self,
         client: Client,
         target_chats: List[ChatId],
-        forward_mode: str = "extract"
+        forward_mode: str = "extract",
+        max_concurrency: int = SEND_CONCURRENCY,
+        rate_limit: int = RATE_LIMIT,
+        collect_details: bool = False,
+        peer_semaphore: Optional[asyncio.Semaphore] = None,
+        batch_window_ms: int = BATCH_WINDOW_MS
     ):
         """
         初始化转发器
@@ -31,12 +74,152 @@ class NodeForwarder:
             client: Pyrogram 客户端实例
             target_chats: 目标群组 ID 列表
             forward_mode: 转发模式 ('extract' 或 'forward')
+            max_concurrency: 同时进行的发送请求上限（所有转发共享）
+            rate_limit: 全局发送速率上限（条/秒）
+            collect_details: 转发结果中是否默认附带每个群组的明细
+            peer_semaphore: 限制群组查询请求并发的信号量，可与其他模块共享
+            batch_window_ms: enqueue_nodes 合并同一来源节点的窗口（毫秒）
         """
         self.client = client
-        self.target_chats = target_chats
+        # 规范化并去重，避免同一群组重复发送
+        self.target_chats = tuple(dict.fromkeys(canonical_chat_id(c) for c in target_chats))
+        # 群组 ID -> InputPeer，首次发送时解析一次，之后直接复用
+        self._peers: Dict[ChatId, InputPeer] = {}
         self.forward_mode = forward_mode
-        self._resolved_chats: Dict[ChatId, bool] = {}
-        self._chat_info: Dict[ChatId, str] = {}  # 缓存群组名称
+        self._collect_details = collect_details
+        self._send_sem = asyncio.Semaphore(max(1, max_concurrency))
+        self._peer_sem = peer_semaphore or asyncio.Semaphore(PEER_CONCURRENCY)
+        # 发送前限速，避免触发 FloodWait：全局限速 + 每个群组 1 条/秒
+        self._limiter = AsyncLimiter(max(1, rate_limit), 1)
+        self._chat_limiters: Dict[ChatId, AsyncLimiter] = defaultdict(lambda: AsyncLimiter(1, 1))
+        # 所有发送共享的 FloodWait 截止时间（事件循环时间），任一发送遇到 FloodWait 都会推后
+        self._flood_cond = asyncio.Condition()
+        self._flood_until = 0.0
+        # 已成功解析的群组 -> 数字 ID
+        self._resolved: Dict[ChatId, int] = {}
+        # 无法解析的群组 -> 失败结果的过期时间（time.monotonic）
+        self._unresolvable: Dict[ChatId, float] = {}
+        # 群组 ID -> 名称（目标群组在解析时填充，来源群组由启动流程登记）
+        self._chat_titles: Dict[ChatId, str] = {}
+        # 已解析 / 未解析的目标群组，由 resolve_all_targets 填充；None 表示尚未解析
+        self._resolved_targets: Optional[List[ChatId]] = None
+        self._unresolved_targets: List[ChatId] = []
+        # 发送时重试过期的未解析目标，同一时间只进行一次
+        self._retry_lock = asyncio.Lock()
+        # 对话索引（数字 ID -> Chat，小写 username -> Chat），首次需要时构建一次
+        self._dialog_ids: Optional[Dict[int, Chat]] = None
+        self._dialog_usernames: Dict[str, Chat] = {}
+        self._dialog_index_lock = asyncio.Lock()
+        # 按来源群组合并短时间内的节点：来源 -> 待发送节点 / 首条来源消息 / 定时器
+        self._batch_window = max(0, batch_window_ms) / 1000
+        self._pending: Dict[int, List[str]] = defaultdict(list)
+        self._pending_source: Dict[int, Message] = {}
+        self._flush_handles: Dict[int, asyncio.TimerHandle] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def _find_in_dialogs(self, chat_id: ChatId) -> Optional[Chat]:
+        """
+        在对话列表中查找群组，首次调用时遍历一次对话列表构建索引
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+
+        Returns:
+            找到的 Chat，未找到时为 None
+        """
+        async with self._dialog_index_lock:
+            if self._dialog_ids is None:
+                ids: Dict[int, Chat] = {}
+                usernames: Dict[str, Chat] = {}
+                async with self._peer_sem:
+                    async for dialog in self.client.get_dialogs():
+                        chat = dialog.chat
+                        ids[chat.id] = chat
+                        if chat.username:
+                            usernames[chat.username.lower()] = chat
+                self._dialog_ids = ids
+                self._dialog_usernames = usernames
+
+        if isinstance(chat_id, str):
+            return self._dialog_usernames.get(chat_id.lstrip("@").lower())
+        return self._dialog_ids.get(chat_id)
+
+    def mark_resolved(self, chat_id: ChatId, title: str, resolved_id: int):
+        """
+        记录已成功解析的群组
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+            title: 群组名称
+            resolved_id: 解析得到的数字 ID
+        """
+        self._unresolvable.pop(chat_id, None)
+        self._resolved[chat_id] = resolved_id
+        self._chat_titles[chat_id] = title
+
+    def remember_chat_title(self, chat_id: ChatId, title: str):
+        """
+        登记群组名称，供日志与消息来源信息直接查表
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+            title: 群组名称
+        """
+        self._chat_titles[chat_id] = title
+
+    def get_chat_title(self, chat_id: ChatId, default: str = "未知群组") -> str:
+        """
+        获取已登记的群组名称
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+            default: 未登记时返回的名称
+
+        Returns:
+            群组名称
+        """
+        return self._chat_titles.get(chat_id) or default
+
+    def mark_unresolvable(self, chat_id: ChatId):
+        """
+        记录无法解析的群组，UNRESOLVABLE_TTL 秒内不再重试
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+        """
+        self._resolved.pop(chat_id, None)
+        self._unresolvable[chat_id] = time.monotonic() + UNRESOLVABLE_TTL
+
+    def _drop_target(self, chat_id: ChatId):
+        """
+        将运行中变为不可访问的群组移出目标列表
+
+        Args:
+            chat_id: 群组 ID
+        """
+        self.mark_unresolvable(chat_id)
+        self._peers.pop(chat_id, None)
+        if self._resolved_targets is not None:
+            self._rebuild_targets()
+
+    def _rebuild_targets(self):
+        """
+        按当前解析结果重新划分已解析 / 未解析的目标群组（保持配置顺序）
+
+        同一群组分别以数字 ID 和 @username 配置时，按解析出的数字 ID 只保留第一项
+        """
+        resolved: List[ChatId] = []
+        unresolved: List[ChatId] = []
+        seen_ids = set()
+        for chat_id in self.target_chats:
+            resolved_id = self._resolved.get(chat_id)
+            if resolved_id is None:
+                unresolved.append(chat_id)
+            elif resolved_id not in seen_ids:
+                seen_ids.add(resolved_id)
+                resolved.append(chat_id)
+        self._resolved_targets = resolved
+        self._unresolved_targets = unresolved
 
     async def resolve_chat(self, chat_id: ChatId) -> bool:
         """
@@ -48,44 +231,44 @@ class NodeForwarder:
         Returns:
             是否成功解析
         """
-        if chat_id in self._resolved_chats:
-            return self._resolved_chats[chat_id]
+        if chat_id in self._resolved:
+            return True
+        expires = self._unresolvable.get(chat_id)
+        if expires is not None:
+            if time.monotonic() < expires:
+                return False
+            del self._unresolvable[chat_id]
 
         try:
             # 尝试获取群组信息来解析 peer
-            chat = await self.client.get_chat(chat_id)
-            chat_title = getattr(chat, 'title', str(chat_id))
-            self._chat_info[chat_id] = chat_title
-            logger.info(f"成功解析群组: {chat_title} ({chat_id})")
-            self._resolved_chats[chat_id] = True
+            async with self._peer_sem:
+                chat = await self.client.get_chat(chat_id)
+            chat_title = chat.title or chat.first_name or str(chat_id)
+            logger.info("成功解析群组: %s (%s)", chat_title, chat_id)
+            self.mark_resolved(chat_id, chat_title, chat.id)
             return True
         except PeerIdInvalid:
             # 尝试通过获取对话记录来解析
             try:
-                logger.info(f"尝试通过对话记录解析 {chat_id}...")
-                async for dialog in self.client.get_dialogs():
-                    if dialog.chat.id == chat_id or (
-                        hasattr(dialog.chat, 'username') and
-                        dialog.chat.username and
-                        f"@{dialog.chat.username}" == str(chat_id)
-                    ):
-                        chat_title = getattr(dialog.chat, 'title', str(chat_id))
-                        self._chat_info[chat_id] = chat_title
-                        logger.info(f"成功解析群组: {chat_title} ({chat_id})")
-                        self._resolved_chats[chat_id] = True
-                        return True
-
-                logger.error(f"无法解析群组 {chat_id}: 未加入该群组或ID错误")
-                logger.error(f"  提示: 请确认已加入该群组，或尝试使用 @username 格式")
-                self._resolved_chats[chat_id] = False
+                logger.info("尝试通过对话记录解析 %s...", chat_id)
+                chat = await self._find_in_dialogs(chat_id)
+                if chat is not None:
+                    chat_title = chat.title or chat.first_name or str(chat_id)
+                    logger.info("成功解析群组: %s (%s)", chat_title, chat_id)
+                    self.mark_resolved(chat_id, chat_title, chat.id)
+                    return True
+
+                logger.error("无法解析群组 %s: 未加入该群组或ID错误", chat_id)
+                logger.error("  提示: 请确认已加入该群组，或尝试使用 @username 格式")
+                self.mark_unresolvable(chat_id)
                 return False
             except Exception as e2:
-                logger.error(f"解析群组 {chat_id} 失败: {e2}")
-                self._resolved_chats[chat_id] = False
+                logger.error("解析群组 %s 失败: %s", chat_id, e2)
+                self.mark_unresolvable(chat_id)
                 return False
         except Exception as e:
-            logger.error(f"解析群组 {chat_id} 失败: {e}")
-            self._resolved_chats[chat_id] = False
+            logger.error("解析群组 %s 失败: %s", chat_id, e)
+            self.mark_unresolvable(chat_id)
             return False
 
     async def resolve_all_targets(self) -> int:
@@ -96,34 +279,74 @@ class NodeForwarder:
             成功解析的群组数量
         """
         logger.info("正在解析目标群组...")
-        success_count = 0
-        for chat_id in self.target_chats:
-            if await self.resolve_chat(chat_id):
-                success_count += 1
+        await self._resolve_many(self.target_chats)
+        self._rebuild_targets()
+        success_count = len(self._resolved_targets)
 
-        logger.info(f"目标群组解析完成: {success_count}/{len(self.target_chats)} 个成功")
+        logger.info("目标群组解析完成: %s/%s 个成功", success_count, len(self.target_chats))
         return success_count
 
-    async def forward_message(self, message: Message, nodes: Optional[List[str]] = None) -> dict:
+    async def _resolve_many(self, chat_ids):
+        """
+        并发解析多个群组（最多 RESOLVE_CONCURRENCY 个同时进行）
+
+        Args:
+            chat_ids: 群组 ID 列表
+        """
+        sem = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+        async def resolve(chat_id: ChatId) -> bool:
+            async with sem:
+                return await self.resolve_chat(chat_id)
+
+        await asyncio.gather(*(resolve(chat_id) for chat_id in chat_ids), return_exceptions=True)
+
+    async def _retry_unresolved_targets(self):
+        """重新解析失败缓存已过期（超过 UNRESOLVABLE_TTL）的目标群组"""
+        # 已有发送在重试时不再等待，本次按当前结果发送
+        if self._retry_lock.locked():
+            return
+        async with self._retry_lock:
+            now = time.monotonic()
+            due = [c for c in self._unresolved_targets if self._unresolvable.get(c, 0.0) <= now]
+            if not due:
+                return
+            # 启动后可能加入了新群组，丢弃旧的对话索引，回退查找时重新拉取
+            async with self._dialog_index_lock:
+                self._dialog_ids = None
+            await self._resolve_many(due)
+            self._rebuild_targets()
+            for chat_id in due:
+                if chat_id in self._resolved:
+                    logger.info("目标群组已恢复: %s", self._chat_titles.get(chat_id, chat_id))
+
+    async def forward_message(
+        self,
+        message: Message,
+        nodes: Optional[List[str]] = None,
+        collect_details: Optional[bool] = None
+    ) -> dict:
         """
         根据配置的模式转发消息
 
         Args:
             message: 原始消息对象
             nodes: 提取的节点列表（仅 extract 模式需要）
+            collect_details: 是否在结果中附带每个群组的明细（None 时使用初始化时的设置）
 
         Returns:
             转发结果统计
         """
         if self.forward_mode == "forward":
-            return await self._forward_raw_message(message)
+            return await self._forward_raw_message(message, collect_details)
         else:
-            return await self._forward_extracted_nodes(nodes or [], message)
+            return await self._forward_extracted_nodes(nodes or [], message, collect_details)
 
     async def _forward_extracted_nodes(
         self,
         nodes: List[str],
-        source_message: Optional[Message] = None
+        source_message: Optional[Message] = None,
+        collect_details: Optional[bool] = None
     ) -> dict:
         """
         提取节点后重新发送
@@ -131,6 +354,7 @@ class NodeForwarder:
         Args:
             nodes: 节点链接列表
             source_message: 原始消息对象
+            collect_details: 是否在结果中附带每个群组的明细（None 时使用初始化时的设置）
 
         Returns:
             转发结果统计
@@ -138,180 +362,301 @@ class NodeForwarder:
         if not nodes:
             return {"success": 0, "failed": 0, "details": []}
 
-        # 构建转发消息
-        message_text = self._build_message(nodes, source_message)
+        # 超出单条消息长度时拆分为多条，按顺序发送
+        result = {"success": 0, "failed": 0, "details": []}
+        for chunk in self._split_nodes(nodes, source_message):
+            message_text = self._build_message(chunk, source_message)
+            chunk_result = await self._send_to_all_targets(message_text, collect_details)
+            result["success"] += chunk_result["success"]
+            result["failed"] += chunk_result["failed"]
+            result["details"].extend(chunk_result["details"])
+        return result
+
+    def _split_nodes(
+        self,
+        nodes: List[str],
+        source_message: Optional[Message] = None
+    ) -> List[List[str]]:
+        """
+        将节点分组，使每组构建出的消息不超过 Telegram 的长度限制
 
-        return await self._send_to_all_targets(message_text)
+        Args:
+            nodes: 节点链接列表
+            source_message: 原始消息对象
 
-    async def _forward_raw_message(self, message: Message) -> dict:
+        Returns:
+            节点分组列表
         """
-        直接转发原始消息
+        # 以单个节点的消息长度为基准，之后每多一个节点增加分隔符与节点本身的长度
+        base = _text_length(self._build_message([], source_message)) + len(str(len(nodes)))
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        size = base
+        for node in nodes:
+            node_size = _text_length(node) + 2
+            if base + node_size > MAX_MESSAGE_LENGTH:
+                logger.warning("节点过长，已跳过: %s...", node[:50])
+                continue
+            if current and size + node_size > MAX_MESSAGE_LENGTH:
+                chunks.append(current)
+                current = []
+                size = base
+            current.append(node)
+            size += node_size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _fan_out(
+        self,
+        send_one: Callable[[ChatId], Awaitable[Optional[str]]],
+        collect_details: Optional[bool] = None
+    ) -> dict:
+        """
+        并发地对所有目标群组执行发送，并汇总结果
 
         Args:
-            message: 要转发的消息对象
+            send_one: 发送到单个群组的协程函数，成功返回 None，失败返回错误信息，不抛出异常
+            collect_details: 是否在结果中附带每个群组的明细（None 时使用初始化时的设置）
 
         Returns:
             转发结果统计
         """
+        if self._resolved_targets is None:
+            await self.resolve_all_targets()
+        elif self._unresolved_targets:
+            await self._retry_unresolved_targets()
+
+        targets = self._resolved_targets
+        # 仍未解析的目标群组同样计为失败
+        unresolved = self._unresolved_targets
+
+        async def run(chat_id: ChatId) -> Optional[str]:
+            async with self._send_sem:
+                return await send_one(chat_id)
+
+        if sys.version_info >= (3, 11):
+            # TaskGroup 保证取消/退出时所有子任务都被正确回收
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(run(chat_id)) for chat_id in targets]
+            errors = [task.result() for task in tasks]
+        else:
+            errors = await asyncio.gather(*(run(chat_id) for chat_id in targets))
+        sent_failed = len(errors) - errors.count(None)
         results = {
-            "success": 0,
-            "failed": 0,
+            "success": len(errors) - sent_failed,
+            "failed": sent_failed + len(unresolved),
             "details": []
         }
+        if collect_details is None:
+            collect_details = self._collect_details
+        if collect_details:
+            results["details"] = [
+                {"chat_id": chat_id, "status": "success"} if error is None
+                else {"chat_id": chat_id, "status": "failed", "error": error}
+                for chat_id, error in zip(targets, errors)
+            ] + [
+                {"chat_id": chat_id, "status": "failed", "error": "群组未解析"}
+                for chat_id in unresolved
+            ]
+        return results
 
-        for chat_id in self.target_chats:
-            # 检查群组是否已解析
-            if not self._resolved_chats.get(chat_id, False):
-                if not await self.resolve_chat(chat_id):
-                    results["failed"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "failed",
-                        "error": "无法解析群组"
-                    })
-                    continue
+    async def _forward_raw_message(self, message: Message, collect_details: Optional[bool] = None) -> dict:
+        """
+        直接转发原始消息
 
-            try:
-                await message.forward(chat_id)
-                results["success"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "success"
-                })
-                chat_name = self._chat_info.get(chat_id, str(chat_id))
-                logger.info(f"成功转发到: {chat_name}")
+        Args:
+            message: 要转发的消息对象
+            collect_details: 是否在结果中附带每个群组的明细（None 时使用初始化时的设置）
 
-            except FloodWait as e:
-                logger.warning(f"FloodWait: 等待 {e.value} 秒")
-                await asyncio.sleep(e.value)
-                try:
-                    await message.forward(chat_id)
-                    results["success"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "success"
-                    })
-                except Exception as retry_error:
-                    results["failed"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "failed",
-                        "error": str(retry_error)
-                    })
-
-            except Exception as e:
-                results["failed"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "failed",
-                    "error": str(e)
-                })
-                logger.error(f"转发消息到 {chat_id} 失败: {e}")
+        Returns:
+            转发结果统计
+        """
+        return await self._fan_out(
+            lambda chat_id: self._forward_one(message, chat_id),
+            collect_details
+        )
 
-        return results
+    async def _forward_one(self, message: Message, chat_id: ChatId) -> Optional[str]:
+        """
+        转发原始消息到单个目标群组
+
+        Args:
+            message: 要转发的消息对象
+            chat_id: 目标群组 ID
+
+        Returns:
+            成功时为 None，失败时为错误信息
+        """
+        try:
+            await self._retry_flood_wait(lambda: self._forward_to_chat(message, chat_id))
+            chat_name = self._chat_titles.get(chat_id, str(chat_id))
+            logger.info("成功转发到: %s", chat_name)
+            return None
+
+        except FloodWait as e:
+            logger.error("FloodWait 重试次数用尽，转发到 %s 失败: %s", chat_id, e)
+            return str(e)
+
+        except ChannelPrivate:
+            logger.error("无法访问频道: %s", chat_id)
+            self._drop_target(chat_id)
+            return "频道已私有或被封禁"
+
+        except Exception as e:
+            logger.error("转发消息到 %s 失败: %s", chat_id, e)
+            return str(e)
 
-    async def _send_to_all_targets(self, text: str) -> dict:
+    async def _send_to_all_targets(self, text: str, collect_details: Optional[bool] = None) -> dict:
         """
         发送消息到所有目标群组
 
         Args:
             text: 要发送的消息文本
+            collect_details: 是否在结果中附带每个群组的明细（None 时使用初始化时的设置）
 
         Returns:
             发送结果统计
         """
-        results = {
-            "success": 0,
-            "failed": 0,
-            "details": []
-        }
+        return await self._fan_out(
+            lambda chat_id: self._send_one(chat_id, text),
+            collect_details
+        )
 
-        for chat_id in self.target_chats:
-            # 检查群组是否已解析
-            if not self._resolved_chats.get(chat_id, False):
-                if not await self.resolve_chat(chat_id):
-                    results["failed"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "failed",
-                        "error": "无法解析群组"
-                    })
-                    continue
+    async def _send_one(self, chat_id: ChatId, text: str) -> Optional[str]:
+        """
+        发送消息到单个目标群组
 
-            try:
-                await self._send_to_chat(chat_id, text)
-                results["success"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "success"
-                })
-                chat_name = self._chat_info.get(chat_id, str(chat_id))
-                logger.info(f"成功发送到: {chat_name}")
+        Args:
+            chat_id: 目标群组 ID
+            text: 要发送的消息文本
+
+        Returns:
+            成功时为 None，失败时为错误信息
+        """
+        try:
+            await self._retry_flood_wait(lambda: self._send_to_chat(chat_id, text))
+            chat_name = self._chat_titles.get(chat_id, str(chat_id))
+            logger.info("成功发送到: %s", chat_name)
+            return None
+
+        except FloodWait as e:
+            logger.error("FloodWait 重试次数用尽，发送到 %s 失败: %s", chat_id, e)
+            return str(e)
+
+        except ChatWriteForbidden:
+            logger.error("无权限发送消息到群组: %s", chat_id)
+            return "无权限发送消息"
+
+        except ChannelPrivate:
+            logger.error("无法访问频道: %s", chat_id)
+            self._drop_target(chat_id)
+            return "频道已私有或被封禁"
+
+        except Exception as e:
+            logger.error("发送到 %s 失败: %s", chat_id, e)
+            return str(e)
+
+    async def _retry_flood_wait(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行 API 调用，遇到 FloodWait 时按封顶的指数退避重试
 
+        每次等待不少于 Telegram 要求的秒数（要求超过 FLOOD_WAIT_CAP 时按要求等待），
+        放弃前同样推后共享截止时间，使其他发送在该时段内暂停
+
+        Args:
+            call: 发起 API 调用的无参协程函数
+
+        Returns:
+            API 调用的返回值
+
+        Raises:
+            FloodWait: 重试次数用尽
+        """
+        delay = 0
+        for attempt in range(FLOOD_RETRIES + 1):
+            await self._wait_flood_deadline()
+            try:
+                return await call()
             except FloodWait as e:
-                logger.warning(f"FloodWait: 等待 {e.value} 秒后重试")
-                await asyncio.sleep(e.value)
+                # 退避只在封顶范围内翻倍，但绝不短于 Telegram 要求的等待，提前重试必然再次触发
+                delay = max(e.value, min(delay * 2, FLOOD_WAIT_CAP))
+                await self._push_flood_deadline(delay)
+                if attempt == FLOOD_RETRIES:
+                    raise
+                logger.warning("FloodWait: 暂停所有发送 %s 秒后重试", delay)
+
+    async def _wait_flood_deadline(self):
+        """等待共享的 FloodWait 截止时间过去"""
+        loop = asyncio.get_running_loop()
+        async with self._flood_cond:
+            while (remaining := self._flood_until - loop.time()) > 0:
                 try:
-                    await self._send_to_chat(chat_id, text)
-                    results["success"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "success"
-                    })
-                except Exception as retry_error:
-                    results["failed"] += 1
-                    results["details"].append({
-                        "chat_id": chat_id,
-                        "status": "failed",
-                        "error": str(retry_error)
-                    })
-                    logger.error(f"重试发送失败 {chat_id}: {retry_error}")
-
-            except ChatWriteForbidden:
-                results["failed"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "failed",
-                    "error": "无权限发送消息"
-                })
-                logger.error(f"无权限发送消息到群组: {chat_id}")
-
-            except ChannelPrivate:
-                results["failed"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "failed",
-                    "error": "频道已私有或被封禁"
-                })
-                logger.error(f"无法访问频道: {chat_id}")
-
-            except Exception as e:
-                results["failed"] += 1
-                results["details"].append({
-                    "chat_id": chat_id,
-                    "status": "failed",
-                    "error": str(e)
-                })
-                logger.error(f"发送到 {chat_id} 失败: {e}")
+                    await asyncio.wait_for(self._flood_cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
 
-        return results
+    async def _push_flood_deadline(self, seconds: float):
+        """
+        推后共享的 FloodWait 截止时间，并唤醒等待者重新计算
 
-    async def _send_to_chat(self, chat_id: ChatId, text: str) -> Message:
+        Args:
+            seconds: 从现在起需要暂停发送的秒数
         """
-        发送消息到指定群组
+        loop = asyncio.get_running_loop()
+        async with self._flood_cond:
+            self._flood_until = max(self._flood_until, loop.time() + seconds)
+            self._flood_cond.notify_all()
+
+    async def _input_peer(self, chat_id: ChatId) -> InputPeer:
+        """
+        获取群组的 InputPeer，结果缓存以免每次发送都重新解析
+
+        Args:
+            chat_id: 群组 ID（数字或 @username）
+
+        Returns:
+            可直接用于原始 API 的 InputPeer
+        """
+        peer = self._peers.get(chat_id)
+        if peer is None:
+            async with self._peer_sem:
+                peer = await self.client.resolve_peer(chat_id)
+            self._peers[chat_id] = peer
+        return peer
+
+    async def _send_to_chat(self, chat_id: ChatId, text: str):
+        """
+        发送纯文本消息到指定群组（受速率限制）
+
+        直接调用原始 SendMessage，跳过文本实体解析和返回消息的构建
 
         Args:
             chat_id: 群组 ID
             text: 消息文本
+        """
+        peer = await self._input_peer(chat_id)
+        async with self._chat_limiters[chat_id], self._limiter:
+            await self.client.invoke(SendMessage(
+                peer=peer,
+                message=text,
+                random_id=self.client.rnd_id(),
+                no_webpage=True
+            ))
+
+    async def _forward_to_chat(self, message: Message, chat_id: ChatId) -> Message:
+        """
+        转发原始消息到指定群组（受速率限制）
+
+        Args:
+            message: 要转发的消息对象
+            chat_id: 群组 ID
 
         Returns:
-            发送的消息对象
+            转发后的消息对象
         """
-        return await self.client.send_message(
-            chat_id=chat_id,
-            text=text,
-            disable_web_page_preview=True
-        )
+        async with self._chat_limiters[chat_id], self._limiter:
+            return await message.forward(chat_id)
 
     def _build_message(
         self,
@@ -328,34 +673,75 @@ class NodeForwarder:
         Returns:
             格式化的消息文本
         """
-        lines = []
-
-        # 添加来源信息
+        # 来源信息
+        header = ""
         if source_message:
-            chat_title = getattr(source_message.chat, 'title', '未知群组')
-            lines.append(f"📡 来源: {chat_title}")
-            lines.append(f"⏰ 时间: {source_message.date}")
-            lines.append("")
+            chat = source_message.chat
+            chat_title = self._chat_titles.get(chat.id) or chat.title or '未知群组'
+            header = f"📡 来源: {chat_title}\n⏰ 时间: {source_message.date}\n\n"
 
-        # 添加节点信息
-        lines.append(f"🔗 发现 {len(nodes)} 个节点:")
-        lines.append("")
+        return f"{header}🔗 发现 {len(nodes)} 个节点:\n\n" + "\n\n".join(nodes)
 
-        for node in nodes:
-            lines.append(node)
-            lines.append("")
+    def enqueue_nodes(self, message: Message, nodes: List[str]):
+        """
+        将节点加入来源群组的合并缓冲区，窗口结束后合并为一条消息发送
+
+        Args:
+            message: 节点所在的原始消息（窗口内第一条作为来源信息）
+            nodes: 提取的节点列表
+        """
+        source_id = message.chat.id
+        self._pending[source_id].extend(nodes)
+        if source_id not in self._flush_handles:
+            self._pending_source[source_id] = message
+            loop = asyncio.get_running_loop()
+            self._flush_handles[source_id] = loop.call_later(
+                self._batch_window, self._schedule_flush, source_id
+            )
+
+    def _schedule_flush(self, source_id: int):
+        """合并窗口到期回调：启动发送任务并保留引用，避免任务被回收"""
+        del self._flush_handles[source_id]
+        task = asyncio.create_task(self._flush(source_id))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, source_id: int):
+        """
+        发送来源群组缓冲区中的全部节点
+
+        Args:
+            source_id: 来源群组 ID
+        """
+        nodes = list(dict.fromkeys(self._pending.pop(source_id, ())))
+        message = self._pending_source.pop(source_id, None)
+        if not nodes:
+            return
+        try:
+            result = await self._forward_extracted_nodes(nodes, message)
+            logger.info("转发完成: 成功 %s, 失败 %s", result['success'], result['failed'])
+        except Exception as e:
+            logger.error("合并转发时出错: %s", e)
 
-        return "\n".join(lines)
+    async def flush_pending(self):
+        """立即发送所有尚在合并窗口中的节点（退出前调用）"""
+        for source_id, handle in list(self._flush_handles.items()):
+            handle.cancel()
+            del self._flush_handles[source_id]
+            await self._flush(source_id)
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks)
 
     # 兼容旧接口
     async def forward_nodes(
         self,
         nodes: List[str],
-        source_message: Optional[Message] = None
+        source_message: Optional[Message] = None,
+        collect_details: Optional[bool] = None
     ) -> dict:
         """兼容旧接口"""
-        return await self._forward_extracted_nodes(nodes, source_message)
+        return await self._forward_extracted_nodes(nodes, source_message, collect_details)
 
-    async def forward_raw_message(self, message: Message) -> dict:
+    async def forward_raw_message(self, message: Message, collect_details: Optional[bool] = None) -> dict:
         """兼容旧接口"""
-        return await self._forward_raw_message(message)
+        return await self._forward_raw_message(message, collect_details)
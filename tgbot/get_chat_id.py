@@ -11,6 +11,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 from pyrogram import Client
 from config import load_config
 
+# 每输出多少个对话写一次标准输出
+FLUSH_EVERY = 200
+
 
 async def main():
     config_path = Path(__file__).parent / "config.ini"
@@ -29,11 +32,7 @@ async def main():
         client_params["bot_token"] = config.telegram.bot_token
 
     if config.proxy.enabled:
-        client_params["proxy"] = {
-            "scheme": config.proxy.type,
-            "hostname": config.proxy.host,
-            "port": config.proxy.port,
-        }
+        client_params["proxy"] = config.proxy.to_pyrogram()
 
     app = Client(**client_params)
 
@@ -43,6 +42,7 @@ async def main():
         print("=" * 60)
 
         count = 0
+        buf = []  # 缓冲输出行，按批写入，避免逐行刷新
         async for dialog in app.get_dialogs():
             count += 1
             chat = dialog.chat
@@ -61,11 +61,18 @@ async def main():
             # 获取用户名
             username = f"@{chat.username}" if chat.username else ""
 
-            print(f"{count:3}. [{chat_type:12}] {name}")
-            print(f"     ID: {chat.id}")
+            buf.append(f"{count:3}. [{chat_type:12}] {name}")
+            buf.append(f"     ID: {chat.id}")
             if username:
-                print(f"     Username: {username}")
-            print()
+                buf.append(f"     Username: {username}")
+            buf.append("")
+
+            if count % FLUSH_EVERY == 0:
+                sys.stdout.write("\n".join(buf) + "\n")
+                buf.clear()
+
+        if buf:
+            sys.stdout.write("\n".join(buf) + "\n")
 
         print("=" * 60)
         print(f"共 {count} 个对话")
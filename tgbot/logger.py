@@ -2,15 +2,24 @@
 日志模块 - 提供统一的日志记录功能
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import List
+
+# 已启动的后台日志线程，程序退出时统一停止
+_listeners: List[QueueListener] = []
 
 
 def setup_logger(name: str = "tgbot", level: str = "INFO", log_file: str = "bot.log") -> logging.Logger:
     """
     设置并返回日志记录器
 
+    实际的控制台/文件输出由后台线程完成，记录日志时不会阻塞事件循环
+
     Args:
         name: 日志记录器名称
         level: 日志级别 (DEBUG/INFO/WARNING/ERROR)
@@ -40,21 +49,42 @@ def setup_logger(name: str = "tgbot", level: str = "INFO", log_file: str = "bot.
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
     # 文件处理器
+    file_error = None
     try:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except Exception as e:
-        logger.warning(f"无法创建日志文件: {e}")
+        file_error = e
+
+    # 记录器只把日志放入队列，由后台线程写出
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger._listener = listener
+    _listeners.append(listener)
+
+    if file_error is not None:
+        logger.warning(f"无法创建日志文件: {file_error}")
 
     return logger
 
 
+def stop_loggers():
+    """停止所有后台日志线程，并写出队列中剩余的日志"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_loggers)
+
+
 # 默认日志记录器
 logger = setup_logger()
@@ -4,9 +4,14 @@ Telegram Proxy Node Listener - 主程序入口
 支持自定义群组和自动加载所有群组两种监听模式
 """
 
+import asyncio
+import logging
 import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, FrozenSet, Union
 
 # 添加当前目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
@@ -17,17 +22,49 @@ from pyrogram import idle
 from pyrogram.enums import ChatType
 
 from config import load_config, BotConfig
-from parser import extract_nodes, contains_nodes
-from forwarder import NodeForwarder
-from logger import setup_logger
+from parser import extract_nodes_or_none
+from forwarder import NodeForwarder, PEER_CONCURRENCY
+from logger import setup_logger, stop_loggers
 
+try:
+    import uvloop  # 可选依赖：基于 libuv 的事件循环，网络吞吐更高
+except ImportError:
+    uvloop = None
 
-# 全局变量
-config: Optional[BotConfig] = None
-logger = None
-forwarder: Optional[NodeForwarder] = None
-app: Optional[Client] = None
-chat_id_map: Dict[Union[int, str], dict] = {}  # 群组信息缓存
+
+# 与 setup_logger(name="tgbot") 配置的是同一个记录器（logger 模块导入时已完成默认配置）
+logger = logging.getLogger("tgbot")
+chat_id_map: Dict[int, dict] = {}  # 群组信息缓存（仅按数字 ID）
+_username_to_id: Dict[str, int] = {}  # 小写 @username -> 数字 ID
+
+# 并发获取对话列表之外群组信息的最大数量
+FETCH_CONCURRENCY = 5
+
+# 所有群组查询请求（get_chat / get_dialogs）共享的并发上限，与转发器共用
+peer_sem = asyncio.Semaphore(PEER_CONCURRENCY)
+
+# 重复消息判定：相同文本在多少秒内只转发一次，最多记录多少条
+DUPLICATE_TTL = 60
+DUPLICATE_CACHE_SIZE = 4096
+
+# 后台转发任务数量、每批最多处理的消息数、凑批时等待下一条消息的秒数
+FORWARD_WORKERS = 4
+FORWARD_BATCH = 16
+FORWARD_BATCH_WAIT = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class Context:
+    """运行上下文，由 main() 创建后显式传递给启动流程和消息处理器"""
+    config: BotConfig
+    app: Client
+    forwarder: NodeForwarder
+    # 待转发消息队列，处理器放入后立即返回，由后台任务批量转发
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    # 近期出现过的文本哈希 -> 首次出现时间，用于跳过重复消息
+    recent_texts: "OrderedDict[int, float]" = field(default_factory=OrderedDict)
+    # 退出时置位，此后处理器不再接收新消息，避免其进入已清空的队列或合并窗口
+    closing: asyncio.Event = field(default_factory=asyncio.Event)
 
 
 def create_client(cfg: BotConfig) -> Client:
@@ -50,16 +87,8 @@ def create_client(cfg: BotConfig) -> Client:
         logger.info("首次运行需要登录验证，请按提示输入手机号和验证码")
 
     if cfg.proxy.enabled:
-        proxy_config = {
-            "scheme": cfg.proxy.type,
-            "hostname": cfg.proxy.host,
-            "port": cfg.proxy.port,
-        }
-        if cfg.proxy.username and cfg.proxy.password:
-            proxy_config["username"] = cfg.proxy.username
-            proxy_config["password"] = cfg.proxy.password
-        client_params["proxy"] = proxy_config
-        logger.info(f"已启用代理: {cfg.proxy.type}://{cfg.proxy.host}:{cfg.proxy.port}")
+        client_params["proxy"] = cfg.proxy.to_pyrogram()
+        logger.info("已启用代理: %s://%s:%s", cfg.proxy.type, cfg.proxy.host, cfg.proxy.port)
 
     return Client(**client_params)
 
@@ -69,63 +98,150 @@ def check_message_filter(text: str, cfg: BotConfig) -> bool:
     if not text:
         return False
 
+    # 只转发节点消息时，不含 "://" 的文本不可能有节点，先于关键词检查直接排除
+    if cfg.filter.nodes_only and "://" not in text:
+        return False
+
+    # 关键词均不区分大小写，只转换一次
+    needs_lower = cfg.filter.exclude_keywords or (cfg.filter.keywords and not cfg.filter.nodes_only)
+    text_lower = text.lower() if needs_lower else ""
+
     # 排除关键词检查
-    if cfg.filter.exclude_keywords:
-        for keyword in cfg.filter.exclude_keywords:
-            if keyword.lower() in text.lower():
-                return False
-
-    # 只转发节点消息
-    if cfg.filter.nodes_only:
-        if not contains_nodes(text):
-            return False
-    elif cfg.filter.keywords:
-        has_keyword = any(kw.lower() in text.lower() for kw in cfg.filter.keywords)
-        if not has_keyword:
+    if cfg.filter.exclude_keywords and cfg.filter.has_exclude_keyword(text_lower):
+        return False
+
+    # 只转发节点消息时由处理器在提取节点时一并判断，避免重复扫描文本
+    if not cfg.filter.nodes_only and cfg.filter.keywords:
+        if not cfg.filter.has_keyword(text_lower):
             return False
 
     return True
 
 
+# 群组类型 -> 配置中使用的名称
+_TYPE_MAP: Dict[ChatType, str] = {
+    ChatType.CHANNEL: "channel",
+    ChatType.SUPERGROUP: "supergroup",
+    ChatType.GROUP: "group",
+    ChatType.PRIVATE: "private",
+    ChatType.BOT: "bot",
+}
+
+
 def get_chat_type_name(chat_type) -> str:
     """获取群组类型名称"""
-    type_map = {
-        ChatType.CHANNEL: "channel",
-        ChatType.SUPERGROUP: "supergroup",
-        ChatType.GROUP: "group",
-        ChatType.PRIVATE: "private",
-        ChatType.BOT: "bot",
-    }
-    return type_map.get(chat_type, str(chat_type).lower())
+    return _TYPE_MAP.get(chat_type, str(chat_type).lower())
 
 
-def should_monitor_chat(chat, cfg: BotConfig) -> bool:
-    """判断是否应该监听该群组"""
-    chat_id = chat.id
+def allowed_chat_types(cfg: BotConfig) -> Optional[FrozenSet[ChatType]]:
+    """
+    将配置的群组类型名称转换为 ChatType 集合
+
+    Returns:
+        允许的 ChatType 集合，未配置类型过滤时为 None
+    """
+    if not cfg.monitor.chat_types:
+        return None
+    return frozenset(t for t, name in _TYPE_MAP.items() if name in cfg.monitor.chat_types)
 
-    # 检查是否在排除列表中
-    if chat_id in cfg.monitor.exclude_chats:
+
+def should_monitor_chat(
+    chat,
+    excluded: FrozenSet[Union[int, str]],
+    allowed_types: Optional[FrozenSet[ChatType]] = None
+) -> bool:
+    """
+    判断是否应该监听该群组
+
+    Args:
+        chat: 群组对象
+        excluded: 不监听的群组，即排除列表与目标群组的并集（数字 ID 和小写 @username）
+        allowed_types: 允许的群组类型，None 表示不限制
+
+    Returns:
+        是否监听
+    """
+    # 检查是否被排除（目标群组也不监听，避免循环转发）
+    if chat.id in excluded:
+        return False
+    username = chat.username
+    if username and f"@{username.lower()}" in excluded:
         return False
-    if hasattr(chat, 'username') and chat.username:
-        if f"@{chat.username}" in cfg.monitor.exclude_chats:
-            return False
 
     # 检查群组类型
-    if cfg.monitor.chat_types:
-        chat_type = get_chat_type_name(chat.type)
-        if chat_type not in cfg.monitor.chat_types:
-            return False
-
-    # 排除目标群组（避免循环转发）
-    if chat_id in cfg.forward.target_chats:
+    if allowed_types is not None and chat.type not in allowed_types:
         return False
-    if hasattr(chat, 'username') and chat.username:
-        if f"@{chat.username}" in cfg.forward.target_chats:
-            return False
 
     return True
 
 
+def cache_chat_info(chat) -> dict:
+    """缓存群组信息（按数字 ID 保存，@username 只记录到 ID 的映射）"""
+    chat_id = chat.id
+    chat_info = {
+        "id": chat_id,
+        "title": chat.title or chat.first_name or str(chat_id),
+        "username": chat.username,
+        "type": get_chat_type_name(chat.type)
+    }
+    chat_id_map[chat_id] = chat_info
+    if chat.username:
+        _username_to_id[f"@{chat.username.lower()}"] = chat_id
+    return chat_info
+
+
+def lookup_chat_info(chat_id: Union[int, str]) -> Optional[dict]:
+    """
+    按配置中的写法查找缓存的群组信息
+
+    Args:
+        chat_id: 群组 ID（数字或小写 @username）
+
+    Returns:
+        群组信息，未缓存时为 None
+    """
+    if isinstance(chat_id, str):
+        chat_id = _username_to_id.get(chat_id)
+    return chat_id_map.get(chat_id)
+
+
+async def fetch_missing_chats(client: Client, chat_ids) -> Dict[Union[int, str], Exception]:
+    """
+    并发获取尚未缓存的群组信息并加入缓存
+
+    Args:
+        client: Pyrogram 客户端
+        chat_ids: 需要的群组 ID（数字或 @username）
+
+    Returns:
+        获取失败的群组及对应异常（由调用方决定是否记录）
+    """
+    missing = [c for c in dict.fromkeys(chat_ids) if lookup_chat_info(c) is None]
+    if not missing:
+        return {}
+
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(chat_id):
+        async with sem:
+            try:
+                async with peer_sem:
+                    return chat_id, await client.get_chat(chat_id)
+            except Exception as e:
+                return chat_id, e
+
+    failed = {}
+    for chat_id, chat in await asyncio.gather(*(fetch(c) for c in missing)):
+        if isinstance(chat, Exception):
+            failed[chat_id] = chat
+        else:
+            cache_chat_info(chat)
+            # 同时记录配置中的 @username 写法，便于后续直接查找
+            if isinstance(chat_id, str):
+                _username_to_id[chat_id] = chat.id
+    return failed
+
+
 async def load_dialogs_and_setup(client: Client, cfg: BotConfig) -> List[int]:
     """
     加载对话列表并设置监听群组
@@ -133,48 +249,84 @@ async def load_dialogs_and_setup(client: Client, cfg: BotConfig) -> List[int]:
     Returns:
         监听群组 ID 列表
     """
-    global chat_id_map
-
     logger.info("正在同步对话列表...")
     dialog_count = 0
     source_chats = []
 
-    async for dialog in client.get_dialogs():
-        dialog_count += 1
-        chat = dialog.chat
-        chat_id = chat.id
-
-        # 缓存群组信息
-        chat_info = {
-            "id": chat_id,
-            "title": getattr(chat, 'title', getattr(chat, 'first_name', str(chat_id))),
-            "username": chat.username,
-            "type": get_chat_type_name(chat.type)
-        }
-        chat_id_map[chat_id] = chat_info
-        if chat.username:
-            chat_id_map[f"@{chat.username}"] = chat_info
-
-        # 根据模式确定是否监听
-        if cfg.is_auto_monitor:
-            # 自动模式：根据规则判断
-            if should_monitor_chat(chat, cfg):
-                source_chats.append(chat_id)
-        else:
-            # 自定义模式：检查是否在配置列表中
-            if chat_id in cfg.monitor.source_chats:
-                source_chats.append(chat_id)
-            elif chat.username and f"@{chat.username}" in cfg.monitor.source_chats:
-                source_chats.append(chat_id)
+    # 遍历对话前一次性准备好集合，循环内只做 O(1) 查找
+    excluded = frozenset(cfg.monitor.exclude_chats).union(cfg.forward.target_chats)
+    wanted_sources = frozenset(cfg.monitor.source_chats)
+    allowed_types = allowed_chat_types(cfg)
+
+    async with peer_sem:
+        async for dialog in client.get_dialogs():
+            dialog_count += 1
+            chat = dialog.chat
+            chat_id = chat.id
+
+            # 缓存群组信息
+            cache_chat_info(chat)
+
+            # 根据模式确定是否监听
+            if cfg.is_auto_monitor:
+                # 自动模式：根据规则判断
+                if should_monitor_chat(chat, excluded, allowed_types):
+                    source_chats.append(chat_id)
+            else:
+                # 自定义模式：检查是否在配置列表中
+                if chat_id in wanted_sources:
+                    source_chats.append(chat_id)
+                elif chat.username and f"@{chat.username.lower()}" in wanted_sources:
+                    source_chats.append(chat_id)
 
-    logger.info(f"已加载 {dialog_count} 个对话")
+    logger.info("已加载 %s 个对话", dialog_count)
     return source_chats
 
 
-def register_handlers(client: Client, cfg: BotConfig, fwd: NodeForwarder, source_chats: List[int]):
+def is_duplicate_text(text: str, recent_texts: "OrderedDict[int, float]") -> bool:
+    """
+    判断相同文本是否在 DUPLICATE_TTL 秒内已出现过（多个来源转发同一批节点时只处理一次）
+
+    Args:
+        text: 消息文本
+        recent_texts: 近期文本哈希 -> 首次出现时间，按出现顺序排列
+
+    Returns:
+        是否为重复消息
+    """
+    now = time.monotonic()
+
+    # 记录按出现时间排序，从最旧的开始清理过期项
+    while recent_texts:
+        oldest = next(iter(recent_texts.values()))
+        if now - oldest <= DUPLICATE_TTL:
+            break
+        recent_texts.popitem(last=False)
+
+    key = hash(text)
+    if key in recent_texts:
+        return True
+
+    recent_texts[key] = now
+    if len(recent_texts) > DUPLICATE_CACHE_SIZE:
+        recent_texts.popitem(last=False)
+    return False
+
+
+def register_handlers(ctx: Context, source_chats: List[int]):
     """注册消息处理器"""
+    # 处理器闭包只引用局部变量，避免每条消息都查找模块全局变量
+    client = ctx.app
+    cfg = ctx.config
+    fwd = ctx.forwarder
+    queue = ctx.queue
+    recent_texts = ctx.recent_texts
+    closing = ctx.closing
+    batch_nodes = cfg.forward.forward_mode == "extract" and cfg.forward.batch_window_ms > 0
 
     # 使用 filters.chat 来过滤监听的群组
+    # source_chats 在对话同步后已全部规范化为数字 ID，过滤器内部为 set，按消息只做一次哈希查找；
+    # 注意 filters.chat 只把 list 视为多个群组，传入 tuple 会被当成单个群组
     if source_chats:
         chat_filter = filters.chat(source_chats)
     else:
@@ -185,29 +337,41 @@ def register_handlers(client: Client, cfg: BotConfig, fwd: NodeForwarder, source
     async def handle_message(c: Client, message: Message):
         """处理来自监听群组的消息"""
         try:
+            if closing.is_set():
+                logger.info("正在退出，忽略消息: %s", message.id)
+                return
+
             text = message.text or message.caption or ""
 
             if not check_message_filter(text, cfg):
                 return
 
-            nodes: List[str] = []
+            if is_duplicate_text(text, recent_texts):
+                logger.debug("跳过重复消息: %s", message.id)
+                return
+
+            nodes: Optional[List[str]] = None
             if cfg.filter.nodes_only or cfg.forward.forward_mode == "extract":
-                nodes = extract_nodes(text)
+                nodes = extract_nodes_or_none(text)
                 if cfg.filter.nodes_only and not nodes:
                     return
 
-            chat_title = getattr(message.chat, 'title', '未知群组')
+            chat_title = fwd.get_chat_title(message.chat.id)
 
             if nodes:
-                logger.info(f"从 [{chat_title}] 发现 {len(nodes)} 个节点")
+                logger.info("从 [%s] 发现 %s 个节点", chat_title, len(nodes))
             else:
-                logger.info(f"从 [{chat_title}] 收到符合条件的消息")
+                logger.info("从 [%s] 收到符合条件的消息", chat_title)
 
-            result = await fwd.forward_message(message, nodes)
-            logger.info(f"转发完成: 成功 {result['success']}, 失败 {result['failed']}")
+            # 节点消息先进入合并窗口，由转发器在窗口结束后统一发送
+            if nodes and batch_nodes:
+                fwd.enqueue_nodes(message, nodes)
+                return
+
+            queue.put_nowait((message, nodes))
 
         except Exception as e:
-            logger.error(f"处理消息时出错: {e}")
+            logger.error("处理消息时出错: %s", e)
 
     # Bot 模式命令
     if cfg.is_bot_mode:
@@ -262,34 +426,90 @@ def register_handlers(client: Client, cfg: BotConfig, fwd: NodeForwarder, source
             await message.reply_text("\n".join(lines))
 
 
-async def start_app():
+async def forward_worker(fwd: NodeForwarder, queue: asyncio.Queue):
+    """
+    后台转发任务：从队列中凑批取出消息并并发转发
+
+    Args:
+        fwd: 转发器
+        queue: 待转发消息队列，元素为 (message, nodes)
+    """
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < FORWARD_BATCH:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), FORWARD_BATCH_WAIT))
+            except asyncio.TimeoutError:
+                break
+
+        results = await asyncio.gather(
+            *(fwd.forward_message(message, nodes) for message, nodes in batch),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("处理消息时出错: %s", result)
+            else:
+                logger.info("转发完成: 成功 %s, 失败 %s", result['success'], result['failed'])
+            queue.task_done()
+
+
+async def start_app(ctx: Context):
     """启动应用"""
-    global app, forwarder, config, chat_id_map
+    app = ctx.app
+    config = ctx.config
+    forwarder = ctx.forwarder
 
     await app.start()
 
     # 获取当前用户信息
     me = await app.get_me()
     if config.is_bot_mode:
-        logger.info(f"已登录: @{me.username} (Bot)")
+        logger.info("已登录: @%s (Bot)", me.username)
     else:
         name = me.first_name or ""
         if me.last_name:
             name += f" {me.last_name}"
         username = f"@{me.username}" if me.username else ""
-        logger.info(f"已登录: {name} {username}")
+        logger.info("已登录: %s %s", name, username)
+
+    # 目标群组信息与对话列表同时获取，不必等对话列表遍历完
+    targets_task = asyncio.create_task(fetch_missing_chats(app, config.forward.target_chats))
 
     # 加载对话并确定监听群组
     source_chats = await load_dialogs_and_setup(app, config)
 
+    # 对话列表中找不到的来源群组（如未出现在列表中的超级群）单独并发获取
+    failed = await targets_task
+    if not config.is_auto_monitor:
+        failed.update(await fetch_missing_chats(app, config.monitor.source_chats))
+    for chat_id, e in failed.items():
+        # 单独获取失败但已在对话列表中找到的不算失败
+        if lookup_chat_info(chat_id) is None:
+            logger.warning("获取群组 %s 信息失败: %s", chat_id, e)
+
+    if not config.is_auto_monitor:
+        known = set(source_chats)
+        for chat_id in config.monitor.source_chats:
+            info = lookup_chat_info(chat_id)
+            if info and info["id"] not in known:
+                known.add(info["id"])
+                source_chats.append(info["id"])
+
     if config.is_auto_monitor:
-        logger.info(f"自动监听模式: 已加载 {len(source_chats)} 个群组")
+        logger.info("自动监听模式: 已加载 %s 个群组", len(source_chats))
         if config.monitor.chat_types:
-            logger.info(f"  群组类型过滤: {', '.join(config.monitor.chat_types)}")
+            logger.info("  群组类型过滤: %s", ', '.join(config.monitor.chat_types))
         if config.monitor.exclude_chats:
-            logger.info(f"  排除群组数: {len(config.monitor.exclude_chats)}")
+            logger.info("  排除群组数: %s", len(config.monitor.exclude_chats))
     else:
-        logger.info(f"自定义监听模式: {len(source_chats)} 个群组")
+        logger.info("自定义监听模式: %s 个群组", len(source_chats))
+
+    # 登记来源群组名称，消息处理时直接查表
+    for chat_id in source_chats:
+        info = chat_id_map.get(chat_id)
+        if info:
+            forwarder.remember_chat_title(chat_id, info['title'])
 
     # 显示监听群组
     logger.info("监听群组列表:")
@@ -297,27 +517,31 @@ async def start_app():
         info = chat_id_map.get(chat_id, {})
         title = info.get('title', str(chat_id))
         chat_type = info.get('type', 'unknown')
-        logger.info(f"  ✓ [{chat_type}] {title}")
+        logger.info("  ✓ [%s] %s", chat_type, title)
     if len(source_chats) > 10:
-        logger.info(f"  ... 等共 {len(source_chats)} 个群组")
+        logger.info("  ... 等共 %s 个群组", len(source_chats))
 
     # 解析目标群组
     logger.info("目标群组列表:")
     for chat_id in config.forward.target_chats:
-        if chat_id in chat_id_map:
-            info = chat_id_map[chat_id]
-            logger.info(f"  ✓ {info['title']}")
-            forwarder._resolved_chats[chat_id] = True
-            forwarder._chat_info[chat_id] = info['title']
+        info = lookup_chat_info(chat_id)
+        if info is not None:
+            logger.info("  ✓ %s", info['title'])
+            forwarder.mark_resolved(chat_id, info['title'], info['id'])
         else:
-            logger.warning(f"  ✗ 未找到 {chat_id}")
-            forwarder._resolved_chats[chat_id] = False
+            logger.warning("  ✗ 未找到 %s", chat_id)
+            forwarder.mark_unresolvable(chat_id)
+    await forwarder.resolve_all_targets()
 
     if not source_chats:
         logger.warning("警告: 没有可监听的群组！")
 
     # 注册处理器
-    register_handlers(app, config, forwarder, source_chats)
+    register_handlers(ctx, source_chats)
+    workers = [
+        asyncio.create_task(forward_worker(forwarder, ctx.queue))
+        for _ in range(FORWARD_WORKERS)
+    ]
 
     logger.info("=" * 50)
     logger.info("启动完成，正在监听消息...")
@@ -325,13 +549,23 @@ async def start_app():
     logger.info("=" * 50)
 
     await idle()
+
+    # 先停止接收新消息，再发送完已排队和仍在合并窗口中的消息，最后断开连接
+    ctx.closing.set()
+    await ctx.queue.join()
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await forwarder.flush_pending()
     await app.stop()
     logger.info("程序已退出")
 
 
 def main():
     """主函数"""
-    global config, logger, forwarder, app
+    # 必须在创建 Client 之前设置，Client 初始化时会获取事件循环
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
     config_path = Path(__file__).parent / "config.ini"
 
@@ -339,7 +573,7 @@ def main():
         config = load_config(str(config_path))
 
         log_file = Path(__file__).parent / config.logging.file
-        logger = setup_logger(
+        setup_logger(
             name="tgbot",
             level=config.logging.level,
             log_file=str(log_file)
@@ -360,20 +594,24 @@ def main():
             sys.exit(1)
 
         monitor_mode = "自动加载" if config.is_auto_monitor else "自定义"
-        logger.info(f"监听模式: {monitor_mode}")
-        logger.info(f"目标群组数: {len(config.forward.target_chats)}")
-        logger.info(f"转发模式: {config.forward.forward_mode}")
+        logger.info("监听模式: %s", monitor_mode)
+        logger.info("目标群组数: %s", len(config.forward.target_chats))
+        logger.info("转发模式: %s", config.forward.forward_mode)
 
         app = create_client(config)
 
         forwarder = NodeForwarder(
             app,
             config.forward.target_chats,
-            config.forward.forward_mode
+            config.forward.forward_mode,
+            config.forward.concurrency,
+            config.forward.rate_limit,
+            peer_semaphore=peer_sem,
+            batch_window_ms=config.forward.batch_window_ms
         )
 
         logger.info("正在连接 Telegram 服务器...")
-        app.run(start_app())
+        app.run(start_app(Context(config, app, forwarder)))
 
     except FileNotFoundError as e:
         print(f"错误: {e}")
@@ -381,25 +619,22 @@ def main():
         sys.exit(1)
 
     except ValueError as e:
-        if logger:
-            logger.error(f"配置错误: {e}")
-        else:
-            print(f"配置错误: {e}")
+        logger.error("配置错误: %s", e)
         sys.exit(1)
 
     except KeyboardInterrupt:
-        if logger:
-            logger.info("收到退出信号")
+        logger.info("收到退出信号")
 
     except Exception as e:
-        if logger:
-            logger.error(f"发生错误: {e}")
-        else:
-            print(f"发生错误: {e}")
+        logger.error("发生错误: %s", e)
         import traceback
         traceback.print_exc()
         sys.exit(1)
 
+    finally:
+        # 写出队列中剩余的日志
+        stop_loggers()
+
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,12 @@
 """
 
 import re
-from typing import List, Set
+from typing import List, Optional, Set
+
+try:
+    import re2  # 可选依赖：google-re2 的 DFA 引擎，扫描耗时与文本长度线性相关
+except ImportError:
+    re2 = None
 
 
 # 支持的节点协议前缀
@@ -19,11 +24,21 @@ SUPPORTED_PROTOCOLS: Set[str] = {
     "wireguard://"
 }
 
+# 供 str.startswith 一次性匹配所有协议前缀（长前缀在前）
+_PROTOCOLS_TUPLE = tuple(sorted(SUPPORTED_PROTOCOLS, key=len, reverse=True))
+
+# 协议名称集合（不含 "://"）
+_PROTO_NAMES = frozenset(p[:-len("://")] for p in SUPPORTED_PROTOCOLS)
+
+# 最长协议前缀的长度，判断协议时只需转换这一段为小写
+_PREFIX_LEN = len(_PROTOCOLS_TUPLE[0])
+
 # 节点链接正则表达式模式
 # 匹配格式: 协议://base64或其他编码内容
-NODE_PATTERN = re.compile(
-    r'((?:vmess|vless|trojan|ss|ssr|hysteria|hy2|tuic|wireguard)://[A-Za-z0-9+/=_\-@:.#?&%]+)',
-    re.IGNORECASE
+# 末尾字符不能是 . : ?（句末标点），匹配结果无需再做清理
+# 使用内联 (?i) 以便 re 与 re2 共用同一模式；安装 google-re2 时自动使用 re2
+NODE_PATTERN = (re2 or re).compile(
+    r'(?i)((?:vmess|vless|trojan|ss|ssr|hysteria|hy2|tuic|wireguard)://[A-Za-z0-9+/=_\-@:.#?&%]*[A-Za-z0-9+/=_\-@#&%])'
 )
 
 
@@ -37,23 +52,25 @@ def extract_nodes(text: str) -> List[str]:
     Returns:
         提取到的节点链接列表（去重）
     """
-    if not text:
+    # 绝大多数消息不含 "://"，一次子串查找即可跳过正则
+    if not text or "://" not in text:
         return []
 
-    # 查找所有匹配的节点链接
-    matches = NODE_PATTERN.findall(text)
+    # 查找所有匹配的节点链接（正则已排除末尾标点），去重并保持顺序
+    return list(dict.fromkeys(NODE_PATTERN.findall(text)))
 
-    # 去重并保持顺序
-    seen: Set[str] = set()
-    nodes: List[str] = []
-    for node in matches:
-        # 清理节点链接（去除末尾可能的无效字符）
-        node = clean_node(node)
-        if node and node not in seen:
-            seen.add(node)
-            nodes.append(node)
 
-    return nodes
+def extract_nodes_or_none(text: str) -> Optional[List[str]]:
+    """
+    一次扫描完成“是否包含节点”的判断与提取
+
+    Args:
+        text: 要解析的文本内容
+
+    Returns:
+        提取到的节点链接列表（去重），没有节点时返回 None
+    """
+    return extract_nodes(text) or None
 
 
 def clean_node(node: str) -> str:
@@ -73,10 +90,8 @@ def clean_node(node: str) -> str:
     node = node.rstrip('.,;:!?\'"）)】》> \t\n\r')
 
     # 验证协议前缀
-    node_lower = node.lower()
-    for protocol in SUPPORTED_PROTOCOLS:
-        if node_lower.startswith(protocol):
-            return node
+    if node[:_PREFIX_LEN].lower().startswith(_PROTOCOLS_TUPLE):
+        return node
 
     return ""
 
@@ -94,14 +109,12 @@ def is_valid_node(node: str) -> bool:
     if not node:
         return False
 
-    node_lower = node.lower()
-    for protocol in SUPPORTED_PROTOCOLS:
-        if node_lower.startswith(protocol):
-            # 确保协议后面有内容
-            content = node[len(protocol):]
-            return len(content) > 0
+    node_prefix = node[:_PREFIX_LEN].lower()
+    if not node_prefix.startswith(_PROTOCOLS_TUPLE):
+        return False
 
-    return False
+    # 确保协议后面有内容（协议名中不含 ":"，第一个 "://" 即前缀结尾）
+    return len(node) > node_prefix.index("://") + 3
 
 
 def get_node_protocol(node: str) -> str:
@@ -117,12 +130,8 @@ def get_node_protocol(node: str) -> str:
     if not node:
         return ""
 
-    node_lower = node.lower()
-    for protocol in SUPPORTED_PROTOCOLS:
-        if node_lower.startswith(protocol):
-            return protocol.rstrip("://")
-
-    return ""
+    scheme, sep, _ = node[:_PREFIX_LEN].lower().partition("://")
+    return scheme if sep and scheme in _PROTO_NAMES else ""
 
 
 def contains_nodes(text: str) -> bool:
@@ -135,7 +144,7 @@ def contains_nodes(text: str) -> bool:
     Returns:
         是否包含节点链接
     """
-    if not text:
+    if not text or "://" not in text:
         return False
 
     return bool(NODE_PATTERN.search(text))
@@ -154,9 +163,8 @@ def format_nodes_message(nodes: List[str]) -> str:
     if not nodes:
         return ""
 
-    lines = [f"🔗 发现 {len(nodes)} 个节点:\n"]
-    for i, node in enumerate(nodes, 1):
-        protocol = get_node_protocol(node)
-        lines.append(f"{i}. [{protocol.upper()}] {node[:50]}...")
-
-    return "\n".join(lines)
+    protocol_of = get_node_protocol
+    return f"🔗 发现 {len(nodes)} 个节点:\n\n" + "\n".join(
+        f"{i}. [{protocol_of(node).upper()}] {node[:50]}..."
+        for i, node in enumerate(nodes, 1)
+    )